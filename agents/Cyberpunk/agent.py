@@ -1,36 +1,22 @@
 from pathlib import Path
 import json, sys, time
 
+# agents/_common.py lives one level up; make the project root importable
+# when this file is run directly as a script.
+_ROOT = str(Path(__file__).resolve().parents[2])
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from agents._common import Memory, plan as _plan
+
 class Agent:
     def __init__(self, name="Cyberpunk", kind="game"):
         self.name = name
         self.kind = kind
         self.root = Path(__file__).resolve().parent
-        self.mem_path = self.root / "memory.json"
-        self._mem = self._load()
-
-    def _load(self):
-        if self.mem_path.exists():
-            try:
-                return json.loads(self.mem_path.read_text(encoding="utf-8"))
-            except Exception:
-                return {}
-        return {}
-
-    def _save(self):
-        self.mem_path.write_text(json.dumps(self._mem, indent=2), encoding="utf-8")
+        self._mem = Memory(self.root)
 
     def plan(self, goal: str):
-        base = [
-            "[" + self.kind + "] analyze goal: " + goal,
-            "collect local data (stub; offline)",
-            "generate structured summary",
-        ]
-        if self.kind == "game":
-            base.insert(1, "enumerate mechanics, loops, and difficulty curve")
-        elif self.kind == "tv":
-            base.insert(1, "enumerate characters, arcs, episodes, motifs")
-        return base
+        return _plan(self.kind, goal)
 
     def run(self, goal: str):
         steps = self.plan(goal)
@@ -43,10 +29,7 @@ class Agent:
             "ts": int(time.time())
         }
         # remember last 20 runs
-        hist = self._mem.get("history", [])
-        hist.append({"goal": goal, "steps": steps[:3], "ts": result["ts"]})
-        self._mem["history"] = hist[-20:]
-        self._save()
+        self._mem.remember({"goal": goal, "steps": steps[:3], "ts": result["ts"]})
         return result
 
 if __name__ == "__main__":
@@ -1,22 +1,20 @@
 from pathlib import Path
 import json, sys
 
+# agents/_common.py lives one level up; make the project root importable
+# when this file is run directly as a script.
+_ROOT = str(Path(__file__).resolve().parents[2])
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from agents._common import plan as _plan
+
 class Agent:
     def __init__(self, name="TVPlotter", kind="tv"):
         self.name = name
         self.kind = kind
 
     def plan(self, goal: str):
-        base = [
-            "[" + self.kind + "] analyze goal: " + goal,
-            "collect local data (stub; offline)",
-            "generate structured summary",
-        ]
-        if self.kind == "game":
-            base.insert(1, "enumerate mechanics, loops, and difficulty curve")
-        elif self.kind == "tv":
-            base.insert(1, "enumerate characters, arcs, episodes, motifs")
-        return base
+        return _plan(self.kind, goal)
 
     def run(self, goal: str):
         steps = self.plan(goal)
@@ -0,0 +1 @@
+"""Bundled GhostForge agents and the helpers they share."""
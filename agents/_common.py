@@ -0,0 +1,102 @@
+"""Helpers shared by the bundled agents."""
+import json, os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HISTORY_LIMIT = 20
+
+# Kind-specific step inserted right after goal analysis.
+_KIND_STEP = {
+    "game": "enumerate mechanics, loops, and difficulty curve",
+    "tv": "enumerate characters, arcs, episodes, motifs",
+}
+
+def plan(kind: str, goal: str):
+    head = f"[{kind}] analyze goal: {goal}"
+    step = _KIND_STEP.get(kind)
+    if step is None:
+        return [head, "collect local data (stub; offline)", "generate structured summary"]
+    return [head, step, "collect local data (stub; offline)", "generate structured summary"]
+
+class Memory:
+    """
+    Run history of one agent: memory.json holds the compacted history and
+    memory.jsonl, one JSON object per line, the runs since then.
+    A log starts with a {"log_gen": n} header. Compaction bumps log_gen in
+    memory.json before the log is removed, so a log left behind by an
+    interrupted compaction is recognised as already folded in.
+    """
+
+    def __init__(self, root, limit: int = HISTORY_LIMIT):
+        self.mem_path = root / "memory.json"
+        self.log_path = root / "memory.jsonl"
+        self.limit = limit
+        self._pending = 0
+        self._stale_log = False
+        self.data = self._load()
+
+    @property
+    def history(self):
+        return self.data["history"]
+
+    def _load(self):
+        mem = {}
+        if self.mem_path.exists():
+            try:
+                mem = json.loads(self.mem_path.read_text(encoding="utf-8"))
+            except Exception:
+                mem = {}
+        hist = mem.get("history") or []
+        if self.log_path.exists():
+            log_gen, entries = 0, []  # logs written before the header are gen 0
+            with self.log_path.open("rb") as f:
+                for i, line in enumerate(f):
+                    try:
+                        obj = json.loads(line)
+                    except ValueError:
+                        continue  # torn write
+                    if i == 0 and isinstance(obj, dict) and list(obj) == ["log_gen"]:
+                        log_gen = obj["log_gen"]
+                        continue
+                    entries.append(obj)
+            if log_gen < mem.get("log_gen", 0):
+                self._stale_log = True
+            else:
+                hist.extend(entries)
+                self._pending = len(entries)
+        mem["history"] = hist[-self.limit:]
+        return mem
+
+    def remember(self, entry):
+        """Record one run: keep the last `limit` in memory, append to the log."""
+        self.data["history"] = (self.data["history"] + [entry])[-self.limit:]
+        if self._stale_log:
+            self.log_path.unlink()
+            self._stale_log = False
+        head = b""
+        if not self.log_path.exists():
+            head = _encode({"log_gen": self.data.get("log_gen", 0)}) + b"\n"
+        with self.log_path.open("ab") as f:
+            f.write(head + _encode(entry) + b"\n")
+        self._pending += 1
+        if self._pending >= self.limit:
+            self.compact()
+
+    def compact(self):
+        """Fold the run log into memory.json atomically, then start a fresh log."""
+        self.data["log_gen"] = self.data.get("log_gen", 0) + 1
+        tmp = self.mem_path.with_name(self.mem_path.name + ".tmp")
+        tmp.write_text(json.dumps(self.data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.mem_path)
+        # a crash here leaves a log whose gen is now behind memory.json's
+        if self.log_path.exists():
+            self.log_path.unlink()
+        self._pending = 0
+
+def _encode(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
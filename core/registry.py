@@ -1,6 +1,9 @@
 
 from pathlib import Path
-import json
+import json, os
+
+# root -> (commands dir mtime_ns, sorted command names)
+_cmd_cache = {}
 
 class Registry:
     """Tracks commands, modules, and artifacts (placeholder)."""
@@ -11,9 +14,18 @@ class Registry:
         return ["modules.rewriter", "modules.tester"]
 
     def list_commands(self):
-        cmds = []
-        for p in sorted((self.root / "commands").glob("*.yaml")):
-            cmds.append(p.stem)
-        return cmds
+        cmd_dir = self.root / "commands"
+        try:
+            mtime = os.stat(cmd_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        cached = _cmd_cache.get(str(self.root))
+        if cached is not None and cached[0] == mtime:
+            return list(cached[1])
+        with os.scandir(cmd_dir) as it:
+            cmds = sorted(e.name[:-5] for e in it
+                          if e.name.endswith(".yaml") and e.is_file())
+        _cmd_cache[str(self.root)] = (mtime, cmds)
+        return list(cmds)
 
 # auto-repair touch: bootstrap
@@ -1,21 +1,52 @@
 
-import os, json, zipfile
+import os, json, time, zipfile
 from pathlib import Path
 from datetime import datetime
 
-def create_snapshot(root: Path, outdir: Path, label: str = "manual"):
+def scan_tree(root, skip_dirs, prefix=""):
+    # Yield (DirEntry, rel_path) for files under root, pruning skip_dirs by name.
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_dirs:
+                    yield from scan_tree(entry.path, skip_dirs, prefix + entry.name + "/")
+            elif entry.is_file():
+                yield entry, prefix + entry.name
+
+_COPY_BUF = bytearray(1 << 20)
+
+# ZipInfo's compression level became public (compress_level) in 3.13.
+_LEVEL_ATTR = "compress_level" if hasattr(zipfile.ZipInfo, "compress_level") else "_compresslevel"
+
+def zip_add(z, path, rel, st=None):
+    # Stream through a reused buffer instead of ZipFile.write's per-file copy,
+    # with the ZipInfo built from a single stat (pass a DirEntry's to reuse it).
+    st = st or os.stat(path)
+    zi = zipfile.ZipInfo(rel, date_time=time.localtime(st.st_mtime)[:6])
+    zi.external_attr = (st.st_mode & 0xFFFF) << 16
+    zi.file_size = st.st_size
+    # z.open(ZipInfo) does not apply the archive defaults the way write() does.
+    zi.compress_type = z.compression
+    setattr(zi, _LEVEL_ATTR, z.compresslevel)
+    view = memoryview(_COPY_BUF)
+    with open(path, "rb", buffering=0) as src, z.open(zi, "w") as dst:
+        while True:
+            n = src.readinto(_COPY_BUF)
+            if not n:
+                break
+            dst.write(view[:n])
+
+def create_snapshot(root: Path, outdir: Path, label: str = "manual",
+                    compression: int = zipfile.ZIP_STORED):
+    # Stored by default for fast dev snapshots; deflate runs at level 1.
     ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
     outdir.mkdir(parents=True, exist_ok=True)
     zip_path = outdir / f"{ts}_{label}.zip"
     manifest = {"ts": ts, "label": label, "root": str(root), "included": []}
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
-        for folder, _, files in os.walk(root):
-            if Path(folder).resolve() == outdir.resolve():
-                continue
-            for file in files:
-                full = Path(folder) / file
-                if full.is_file() and outdir not in full.parents:
-                    rel = full.relative_to(root)
-                    z.write(full, rel.as_posix())
-                    manifest["included"].append(rel.as_posix())
+    skip_dirs = {outdir.name, "__pycache__", ".forge"}
+    level = 1 if compression == zipfile.ZIP_DEFLATED else None
+    with zipfile.ZipFile(zip_path, "w", compression, compresslevel=level) as z:
+        for entry, rel in scan_tree(root, skip_dirs):
+            zip_add(z, entry.path, rel, entry.stat())
+            manifest["included"].append(rel)
     return zip_path, manifest
@@ -12,10 +12,21 @@ class Rule:
 class Warden:
     def __init__(self, rules: List[Rule]):
         self.rules = rules
+        # Rules are fixed at construction time, so compile them once here.
+        self._compiled = [(r.id, re.compile(r.pattern)) for r in rules]
+        # Fused alternation used as a single-pass prefilter: clean text (the
+        # common case) is scanned once instead of once per rule. Rules with
+        # capture groups stay out of it (joining renumbers groups and breaks
+        # back-references) and are always checked on their own.
+        plain = [r.pattern for r, (_, pat) in zip(rules, self._compiled) if pat.groups == 0]
+        try:
+            self._any = re.compile("|".join(f"(?:{p})" for p in plain)) if plain else None
+        except re.error:
+            self._any = None
 
     def scan_text(self, text: str):
-        hits = []
-        for r in self.rules:
-            if re.search(r.pattern, text):
-                hits.append(r.id)
-        return hits
+        if not self._compiled:
+            return []
+        if self._any is not None and not self._any.search(text):
+            return [rid for rid, pat in self._compiled if pat.groups and pat.search(text)]
+        return [rid for rid, pat in self._compiled if pat.search(text)]
@@ -3,16 +3,46 @@
 # Single-file CLI kernel with safe self-repair, snapshots, and agent scaffolding.
 
 import argparse
+import atexit
+import hashlib
 import json
 import os
 import re
 import shutil
 import sqlite3
 import sys
+import tempfile
+import threading
+import time
 import zipfile
-from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from importlib import util as importlib_util
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+except ImportError:  # optional C accelerator for manifests and audit details
+    orjson = None
+
+    def _dumps(obj) -> str:
+        # same compact, non-ASCII-escaping output as orjson
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+try:
+    import yaml
+    try:
+        from yaml import CSafeLoader as _YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as _YamlLoader
+except ImportError:  # optional: the built-in parser covers our own files
+    yaml = None
 
 # --------------------------- Paths & constants ---------------------------
 
@@ -23,12 +53,81 @@ FREEZE_FLAG = STATE / "FORGE_FREEZE"
 CMD_DIR = ROOT / "commands"
 POL_DIR = ROOT / "policies"
 FORGE_TMP = ROOT / ".forge"
+CACHE_DIR = FORGE_TMP / "cache"
 SNAP_DIR = ROOT / "snapshots"
+OBJ_DIR = SNAP_DIR / "objects"
 TESTS_DIR = ROOT / "tests"
 AGENTS_DIR = ROOT / "agents"
 
+# Snapshot archive codecs: stored for fast dev snapshots, deflate for
+# archival; zstd when the running zipfile supports it (Python 3.14+).
+# Levels favour throughput over ratio: snapshots are mostly small text files.
+SNAP_COMPRESSION = {"stored": zipfile.ZIP_STORED, "deflated": zipfile.ZIP_DEFLATED}
+SNAP_COMPRESSLEVEL = {zipfile.ZIP_DEFLATED: 1}
+if hasattr(zipfile, "ZIP_ZSTANDARD"):
+    SNAP_COMPRESSION["zstd"] = zipfile.ZIP_ZSTANDARD
+    SNAP_COMPRESSLEVEL[zipfile.ZIP_ZSTANDARD] = 3
+
+# Hard safety rails, always appended to the policy patterns.
+SAFETY_RAILS = (r"(eval\()", r"(exec\()", r"\b(requests|httpx|socket)\b")
+
 # --------------------------- Bootstrap state -----------------------------
 
+# WAL is persistent in the DB file; the rest are per-connection settings.
+# synchronous=NORMAL is durable under WAL except for the last commits on
+# power loss, and drops the fsync pair per audit insert.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA journal_size_limit=6144000",
+)
+
+# Hot statements, kept as single constants so every call hits the same
+# entry in the connection's prepared-statement cache.
+_SQL_INSERT_AUDIT = ("INSERT INTO audit_log (ts, actor, action, detail, prev_hash, row_hash) "
+                     "VALUES (?,?,?,?,?,?)")
+_SQL_INSERT_SNAP = "INSERT INTO snapshots (ts,label,path,manifest) VALUES (?,?,?,?)"
+_SQL_CHAIN_HEAD = "SELECT row_hash FROM audit_log ORDER BY id DESC LIMIT 1"
+
+_CONN = None
+_DB_LOCK = threading.RLock()
+
+def _db() -> sqlite3.Connection:
+    """Shared autocommit SQLite connection, opened and tuned on first use."""
+    global _CONN
+    with _DB_LOCK:
+        if _CONN is None:
+            conn = sqlite3.connect(DB, isolation_level=None, check_same_thread=False)
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            _CONN = conn
+    return _CONN
+
+def _close_db():
+    """Flush buffered audit rows, then close the shared connection."""
+    global _CONN
+    with _DB_LOCK:
+        forge_flush()
+        if _CONN is not None:
+            _CONN.close()
+            _CONN = None
+
+@contextmanager
+def _write_tx():
+    """BEGIN IMMEDIATE ... COMMIT on the shared connection, one writer at a time."""
+    conn = _db()
+    with _DB_LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
 def ensure_state():
     """Ensure required folders and SQLite tables exist."""
     (STATE / "blobs").mkdir(parents=True, exist_ok=True)
@@ -39,7 +138,7 @@ def ensure_state():
     TESTS_DIR.mkdir(exist_ok=True)
     AGENTS_DIR.mkdir(exist_ok=True)
 
-    conn = sqlite3.connect(DB)
+    conn = _db()
     cur = conn.cursor()
     cur.execute("""
     CREATE TABLE IF NOT EXISTS audit_log (
@@ -47,8 +146,15 @@ def ensure_state():
         ts TEXT NOT NULL,
         actor TEXT NOT NULL,
         action TEXT NOT NULL,
-        detail TEXT
+        detail TEXT,
+        prev_hash BLOB,
+        row_hash BLOB
     )""")
+    # One-time migration for logs created before rows were hash-chained
+    cols = {row[1] for row in cur.execute("PRAGMA table_info(audit_log)")}
+    for col in ("prev_hash", "row_hash"):
+        if col not in cols:
+            cur.execute(f"ALTER TABLE audit_log ADD COLUMN {col} BLOB")
     cur.execute("""
     CREATE TABLE IF NOT EXISTS snapshots (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -57,20 +163,83 @@ def ensure_state():
         path TEXT NOT NULL,
         manifest TEXT NOT NULL
     )""")
-    conn.commit()
-    conn.close()
+    # Indexes for ts/actor lookups; gather planner stats once, when created
+    have = {row[0] for row in cur.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    indexes = {
+        "idx_audit_ts": "audit_log(ts)",
+        "idx_audit_actor": "audit_log(actor)",
+        "idx_snap_ts": "snapshots(ts)",
+    }
+    missing = [name for name in indexes if name not in have]
+    for name in missing:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {indexes[name]}")
+    if missing:
+        cur.execute("ANALYZE")
 
 # --------------------------- Utilities -----------------------------------
 
-def log(actor: str, action: str, detail: str = ""):
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO audit_log (ts, actor, action, detail) VALUES (?,?,?,?)",
-        (datetime.now(timezone.utc).isoformat(), actor, action, detail),
-    )
-    conn.commit()
-    conn.close()
+def _row_hash(prev: bytes, ts: str, actor: str, action: str, detail: str) -> bytes:
+    h = hashlib.sha256(prev)
+    h.update("\x1f".join((ts, actor, action, detail or "")).encode("utf-8"))
+    return h.digest()
+
+# Audit rows wait here and are written in one transaction per flush.
+# They carry time.time_ns(); the ISO timestamp is only built at flush.
+_LOG_BUF: list = []
+_LOG_FLUSH_AT = 32
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _flush_log(conn: sqlite3.Connection):
+    """
+    Insert the buffered audit rows inside the caller's write transaction.
+    Rows are Merkle-chained: row_hash = sha256(prev_hash || fields), so any
+    edit or deletion in the log breaks every later hash. The chain head is
+    read under the caller's BEGIN IMMEDIATE lock.
+    """
+    pending = _LOG_BUF[:]
+    if not pending:
+        return
+    last = conn.execute(_SQL_CHAIN_HEAD).fetchone()
+    prev = (last[0] if last else None) or b""
+    rows = []
+    for ts_ns, actor, action, detail in pending:
+        ts = (_EPOCH + timedelta(microseconds=ts_ns // 1000)).isoformat()
+        row_hash = _row_hash(prev, ts, actor, action, detail)
+        rows.append((ts, actor, action, detail, prev, row_hash))
+        prev = row_hash
+    conn.executemany(_SQL_INSERT_AUDIT, rows)
+    del _LOG_BUF[:len(pending)]
+
+def forge_flush():
+    """Commit any buffered audit rows."""
+    if _LOG_BUF:
+        with _write_tx() as conn:
+            _flush_log(conn)
+
+def log(actor: str, action: str, detail=""):
+    """Queue an audit row; dict/list details are JSON-encoded here, once."""
+    if isinstance(detail, (dict, list)):
+        detail = _dumps(detail)
+    _LOG_BUF.append((time.time_ns(), actor, action, detail))
+    if len(_LOG_BUF) >= _LOG_FLUSH_AT:
+        forge_flush()
+
+atexit.register(_close_db)
+
+_YAML_RUN_RE = re.compile(r"^-+\s*run\s*:\s*(.+)$")
+_YAML_KV_RE = re.compile(r"^([A-Za-z0-9_.-]+)\s*:\s*(.*)$")
+_POLICY_PATTERN_RE = re.compile(r"pattern\s*:\s*(.+)$")
+_YAML_COMMENT_RE = re.compile(r"\s+#.*$")
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+def _policy_scalar(v: str) -> str:
+    """Pattern text as YAML reads it: quotes removed, or a ' #' comment dropped."""
+    v = v.strip()
+    if v[:1] in ("'", '"'):
+        end = v.find(v[0], 1)
+        if end > 0:
+            return v[1:end]
+    return _YAML_COMMENT_RE.sub("", v)
 
 def _strip_quotes(s: str) -> str:
     s = s.strip()
@@ -78,7 +247,64 @@ def _strip_quotes(s: str) -> str:
         return s[1:-1]
     return s
 
-def load_yaml_like(path: Path) -> dict:
+def load_yaml_like(path: Path):
+    """
+    Load a YAML spec/policy file as a read-only mapping ({} if missing).
+    Parses are cached on the file's (mtime_ns, size), in memory and in a
+    JSON sidecar under .forge/cache, so repeat loads of an unchanged file
+    skip the YAML parse; the result is shared and must not be mutated.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return MappingProxyType({})
+    return _load_cached(str(path), st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=128)
+def _load_cached(path_str: str, mtime_ns: int, size: int):
+    path = Path(path_str)
+    # The sidecar records the stamp it was parsed from and is only used on
+    # an exact match: a replaced file may carry an older preserved mtime.
+    key = hashlib.sha256(path_str.encode("utf-8")).hexdigest()[:16]
+    sidecar = CACHE_DIR / f"{key}-{path.name}.json"
+    try:
+        cached = json.loads(sidecar.read_bytes())
+        if cached["mtime_ns"] == mtime_ns and cached["size"] == size:
+            return MappingProxyType(cached["data"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    data = _load_yaml_file(path)
+    try:
+        text = _dumps({"mtime_ns": mtime_ns, "size": size, "data": data})
+        if json.loads(text)["data"] == data:  # only cache what JSON round-trips
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = sidecar.with_name(sidecar.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, sidecar)
+    except (OSError, TypeError, ValueError):
+        pass
+    return MappingProxyType(data)
+
+def _load_yaml_file(path: Path) -> dict:
+    """
+    Parse one existing YAML file into a dict.
+    Uses PyYAML (the LibYAML C loader when available) if installed, and
+    falls back to the built-in parser when it is not or the file is not
+    strict YAML.
+    """
+    if yaml is not None:
+        try:
+            with path.open("rb") as f:
+                data = yaml.load(f, Loader=_YamlLoader)
+            if data is None:
+                return {}
+            if isinstance(data, dict):
+                return data
+        except yaml.YAMLError:
+            pass
+    return _parse_yaml_like(path)
+
+def _parse_yaml_like(path: Path) -> dict:
     """
     Minimal, forgiving YAML-ish parser:
     - Supports 'key: value' (flat)
@@ -90,32 +316,31 @@ def load_yaml_like(path: Path) -> dict:
     if not path.exists():
         return data
 
-    lines = path.read_text(encoding="utf-8").splitlines()
-    for raw in lines:
-        line = raw.rstrip("\n")
-        s = line.strip()
-
-        if not s or s.startswith("#"):
-            continue
-
-        # List item for steps
-        m_run = re.match(r"^-+\s*run\s*:\s*(.+)$", s)
-        if m_run:
-            if "steps" not in data or not isinstance(data.get("steps"), list):
-                data["steps"] = []
-            data["steps"].append({"run": _strip_quotes(m_run.group(1))})
-            continue
-
-        # key: value pairs
-        m_kv = re.match(r"^([A-Za-z0-9_.-]+)\s*:\s*(.*)$", s)
-        if m_kv:
-            k, v = m_kv.group(1), m_kv.group(2)
-            v = _strip_quotes(v)
-            if k == "steps" and (v == "" or v == "[]"):
-                data["steps"] = []
-            else:
-                data[k] = v if v != "" else None
-            continue
+    with path.open("r", encoding="utf-8") as f:
+        for raw in f:
+            s = raw.strip()
+
+            if not s or s.startswith("#"):
+                continue
+
+            # List item for steps
+            m_run = _YAML_RUN_RE.match(s)
+            if m_run:
+                if "steps" not in data or not isinstance(data.get("steps"), list):
+                    data["steps"] = []
+                data["steps"].append({"run": _strip_quotes(m_run.group(1))})
+                continue
+
+            # key: value pairs
+            m_kv = _YAML_KV_RE.match(s)
+            if m_kv:
+                k, v = m_kv.group(1), m_kv.group(2)
+                v = _strip_quotes(v)
+                if k == "steps" and (v == "" or v == "[]"):
+                    data["steps"] = []
+                else:
+                    data[k] = v if v != "" else None
+                continue
 
     return data
 
@@ -123,13 +348,14 @@ def load_yaml_like(path: Path) -> dict:
 
 def status():
     frozen = FREEZE_FLAG.exists()
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM audit_log")
-    logs = cur.fetchone()[0]
-    cur.execute("SELECT COUNT(*) FROM snapshots")
-    snaps = cur.fetchone()[0]
-    conn.close()
+    forge_flush()
+    # Both tables are append-only AUTOINCREMENT, so sqlite_sequence holds
+    # their row counts: one O(1) lookup instead of two COUNT(*) scans.
+    seq = dict(_db().execute(
+        "SELECT name, seq FROM sqlite_sequence WHERE name IN ('audit_log', 'snapshots')"
+    ).fetchall())
+    logs = seq.get("audit_log", 0)
+    snaps = seq.get("snapshots", 0)
     print("GhostForge v1.2 :: status")
     print(f"  location : {ROOT}")
     print(f"  frozen   : {'YES' if frozen else 'no'}")
@@ -149,64 +375,226 @@ def thaw():
 
 def list_commands():
     print("Available commands:")
-    for p in sorted(CMD_DIR.glob("*.yaml")):
-        spec = load_yaml_like(p)
-        name = spec.get("name", p.stem)
+    with os.scandir(CMD_DIR) as it:
+        files = [e.name for e in it
+                 if e.name.endswith(".yaml") and e.is_file()]
+    files.sort()
+    for fname in files:
+        spec = load_yaml_like(CMD_DIR / fname)
+        name = spec.get("name", fname[:-5])
         cap = spec.get("capability", "?")
         ver = spec.get("version", "?")
         print(f"  - {name} :: capability={cap} version={ver}")
 
-def create_snapshot(label: str = "manual"):
+def _scan(root, skip_dirs, prefix: str = ""):
+    """
+    Yield (DirEntry, rel_path) for every file under root.
+    Directories named in skip_dirs are pruned without being descended;
+    rel_path is posix-style, ready to use as a zip member name.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_dirs:
+                    yield from _scan(entry.path, skip_dirs, prefix + entry.name + "/")
+            elif entry.is_file():
+                yield entry, prefix + entry.name
+
+# Journal files next to a SQLite DB; copies go through the backup API instead.
+_SQLITE_SIDE_FILES = (".sqlite-wal", ".sqlite-shm", ".sqlite-journal")
+
+# Shared copy buffer for streaming files into snapshot archives.
+_COPY_BUF = bytearray(1 << 20)
+# Python 3.13 made the per-member level public; older versions only have the private slot.
+_ZI_LEVEL_ATTR = "compress_level" if hasattr(zipfile.ZipInfo, "compress_level") else "_compresslevel"
+
+def _zip_add(z: zipfile.ZipFile, path: str, rel: str, st: os.stat_result = None) -> str:
+    """
+    Stream one file into an open archive through the shared copy buffer.
+    Returns the sha256 of its contents, hashed on the same pass.
+    """
+    # Build the ZipInfo from the one stat we need (ZipFile.write and
+    # ZipInfo.from_file would stat and normalise the path again).
+    if st is None:
+        st = os.stat(path)
+    zi = zipfile.ZipInfo(rel, date_time=time.localtime(st.st_mtime)[:6])
+    zi.external_attr = (st.st_mode & 0xFFFF) << 16
+    zi.file_size = st.st_size
+    # ZipFile.write applies the archive defaults; z.open(ZipInfo) does not.
+    zi.compress_type = z.compression
+    setattr(zi, _ZI_LEVEL_ATTR, z.compresslevel)
+    h = hashlib.sha256()
+    view = memoryview(_COPY_BUF)
+    with open(path, "rb", buffering=0) as src, z.open(zi, "w") as dst:
+        while True:
+            n = src.readinto(_COPY_BUF)
+            if not n:
+                break
+            h.update(view[:n])
+            dst.write(view[:n])
+    return h.hexdigest()
+
+def _store_object(full: str) -> str:
+    """
+    Add a file to the content-addressed object store; return its digest.
+    The file is hashed on the same pass that copies it into a unique temp
+    file in the store, which is then renamed to its digest, or dropped if
+    that object is already stored.
+    """
+    OBJ_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=OBJ_DIR, suffix=".tmp")
+    try:
+        h = hashlib.sha256()
+        view = memoryview(_COPY_BUF)
+        with open(full, "rb", buffering=0) as src, os.fdopen(fd, "wb", buffering=0) as dst:
+            while True:
+                n = src.readinto(_COPY_BUF)
+                if not n:
+                    break
+                h.update(view[:n])
+                dst.write(view[:n])
+        digest = h.hexdigest()
+        obj = OBJ_DIR / digest[:2] / digest
+        if obj.exists():
+            os.unlink(tmp)
+        else:
+            obj.parent.mkdir(exist_ok=True)
+            os.replace(tmp, obj)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return digest
+
+def create_snapshot(label: str = "manual", compression: int = zipfile.ZIP_STORED,
+                    dedup: bool = False):
+    """
+    Capture the tree into SNAP_DIR/<ts>_<label>.zip.
+    With dedup=True file contents go to the shared object store once
+    (snapshots/objects/<sha256>) and the zip only holds a manifest.json
+    mapping each path to its digest.
+    The file list is streamed to <zip>.manifest.txt in sha256sum format;
+    the snapshots row only keeps a summary (file count and the sha256 of
+    that listing).
+    SQLite databases are captured through the backup API (so the live WAL
+    is included) rather than read off disk; -wal/-shm/-journal files are
+    left out.
+    """
     ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
     zip_path = SNAP_DIR / f"{ts}_{label}.zip"
     zip_path.parent.mkdir(parents=True, exist_ok=True)
-
-    manifest = {
-        "ts": ts,
-        "label": label,
-        "root": str(ROOT),
-        "included": [],
-    }
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
-        for folder, _, files in os.walk(ROOT):
-            fpath = Path(folder)
-            # Skip snapshot dir and tmp forge area
-            if fpath.resolve() in {SNAP_DIR.resolve(), FORGE_TMP.resolve()}:
+    list_path = zip_path.with_name(zip_path.name + ".manifest.txt")
+
+    # Skip snapshot dir, tmp forge area and compiled caches; include
+    # everything else (including DB/state) for a full capture.
+    skip_dirs = {SNAP_DIR.name, FORGE_TMP.name, "__pycache__"}
+    level = SNAP_COMPRESSLEVEL.get(compression)
+    objects = {}
+    tree = hashlib.sha256()
+    n_files = 0
+    FORGE_TMP.mkdir(exist_ok=True)
+    with zipfile.ZipFile(zip_path, "w", compression, compresslevel=level) as z, \
+            list_path.open("w", encoding="utf-8", newline="\n") as listing, \
+            tempfile.TemporaryDirectory(dir=FORGE_TMP) as scratch:
+        for entry, rel in _scan(ROOT, skip_dirs):
+            if entry.name.endswith(_SQLITE_SIDE_FILES):
                 continue
-            for file in files:
-                full = fpath / file
-                # Exclude compiled caches
-                if "__pycache__" in full.parts:
-                    continue
-                # Include everything else (including DB/state) for a full capture
-                rel = full.relative_to(ROOT)
-                z.write(full, rel.as_posix())
-                manifest["included"].append(rel.as_posix())
-
-    conn = sqlite3.connect(DB)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO snapshots (ts,label,path,manifest) VALUES (?,?,?,?)",
-        (ts, label, str(zip_path), json.dumps(manifest)),
-    )
-    conn.commit()
-    conn.close()
-    log("forge", "snapshot", json.dumps({"label": label, "zip": str(zip_path)}))
+            src, st = entry.path, None
+            if entry.name.endswith(".sqlite"):
+                src = os.path.join(scratch, f"{n_files}.sqlite")
+                _copy_db(entry.path, src)
+            elif not dedup:
+                st = entry.stat()
+            if dedup:
+                digest = objects[rel] = _store_object(src)
+            else:
+                digest = _zip_add(z, src, rel, st)
+            line = f"{digest}  {rel}\n"
+            listing.write(line)
+            tree.update(line.encode("utf-8"))
+            n_files += 1
+        if dedup:
+            z.writestr("manifest.json", _dumps({
+                "ts": ts, "label": label, "store": OBJ_DIR.relative_to(ROOT).as_posix(),
+                "objects": objects,
+            }))
+
+    # Snapshot row and the pending audit rows commit together (one journal flush).
+    log("forge", "snapshot", {"label": label, "zip": str(zip_path)})
+    with _write_tx() as conn:
+        conn.execute(
+            _SQL_INSERT_SNAP,
+            (ts, label, str(zip_path), _dumps({
+                "ts": ts, "label": label, "root": str(ROOT), "dedup": dedup,
+                "n_files": n_files, "sha256": tree.hexdigest(),
+                "listing": list_path.name,
+            })),
+        )
+        _flush_log(conn)
     print(f"Snapshot created: {zip_path}")
 
-def _load_repair_policy_patterns() -> list:
-    """Very simple policy loader: collect 'pattern:' entries from repair.policy.yaml."""
-    pol = POL_DIR / "repair.policy.yaml"
+def _load_repair_policy_patterns(pol: Path, policy=None) -> list:
+    """
+    Collect the blocked 'pattern:' entries of a repair policy.
+    Uses the 'rules' list of the already-loaded policy when it has one
+    (PyYAML) and every pattern in it is a string; otherwise scans the
+    file's lines, so a value YAML would retype (on, ~, 0x10, [abc]) is
+    still blocked as the literal text written in the policy.
+    """
+    rules = (policy or {}).get("rules")
     pats = []
-    if pol.exists():
-        for line in pol.read_text(encoding="utf-8").splitlines():
-            m = re.search(r"pattern\s*:\s*(.+)$", line.strip())
-            if m:
-                pats.append(_strip_quotes(m.group(1)))
+    if isinstance(rules, list):
+        raw = [r.get("pattern") for r in rules if isinstance(r, dict) and "pattern" in r]
+        if all(isinstance(p, str) for p in raw):
+            pats = raw
+        else:
+            print(f"[warden] WARN: non-string pattern in {pol.name}; reading patterns as literal text")
+            rules = None
+    if not isinstance(rules, list) and pol.exists():
+        with pol.open("r", encoding="utf-8") as f:
+            for line in f:
+                m = _POLICY_PATTERN_RE.search(line.strip())
+                if m:
+                    pats.append(_policy_scalar(m.group(1)))
     # Always add hard safety rails
-    pats.extend([r"(eval\()", r"(exec\()", r"\b(requests|httpx|socket)\b"])
+    pats.extend(SAFETY_RAILS)
     return pats
 
+@lru_cache(maxsize=8)
+def _policy_matchers(patterns: tuple):
+    """
+    Compile a policy's patterns once per distinct pattern set.
+    Returns ((pattern, regex) pairs, invalid patterns, fused alternation
+    of the group-free valid ones or None).
+    Patterns with capture groups are never fused: joining renumbers their
+    groups, so a back-reference like \\1 would stop matching. Callers must
+    scan those individually even when the fused prefilter misses.
+    """
+    valid, invalid = [], []
+    for pat in patterns:
+        try:
+            valid.append((pat, re.compile(pat)))
+        except re.error:
+            invalid.append(pat)
+    plain = [pat for pat, rx in valid if rx.groups == 0]
+    try:
+        fused = re.compile("|".join(f"(?:{pat})" for pat in plain)) if plain else None
+    except re.error:
+        fused = None  # e.g. inline flags that are only legal at a pattern's start
+    return tuple(valid), tuple(invalid), fused
+
+def compile_policies(pol: Path = None) -> dict:
+    """
+    Parse and compile a repair policy ahead of time: validates every
+    pattern and warms the parsed-YAML sidecar so the next run_repair
+    skips the YAML parse. Returns a summary of the pattern set.
+    """
+    pol = pol or POL_DIR / "repair.policy.yaml"
+    pats = _load_repair_policy_patterns(pol, load_yaml_like(pol))
+    valid, invalid, fused = _policy_matchers(tuple(pats))
+    return {"policy": pol.name, "patterns": len(valid), "invalid": list(invalid),
+            "fused": fused is not None}
+
 def _boolish(v, default=True):
     if isinstance(v, bool):
         return v
@@ -215,27 +603,85 @@ def _boolish(v, default=True):
     s = str(v).strip().lower()
     return s in {"1", "true", "yes", "y", "on"}
 
+def _run_one(p: Path):
+    """Import one golden test and call its run(); returns (name, ok, error)."""
+    name = p.stem
+    try:
+        spec = importlib_util.spec_from_file_location(name, p)
+        mod = importlib_util.module_from_spec(spec)  # type: ignore
+        assert spec is not None and spec.loader is not None
+        spec.loader.exec_module(mod)  # type: ignore
+        result = True
+        if hasattr(mod, "run") and callable(mod.run):
+            result = bool(mod.run())
+        return name, result, None
+    except Exception as e:
+        return name, False, str(e)
+
 def run_tests(silent: bool = False) -> bool:
+    # Golden tests are independent; run them in worker processes so they
+    # overlap and cannot leak module state into the forge process.
+    paths = sorted(TESTS_DIR.glob("test_*.py"))
+    if not paths:
+        return True
+    with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as ex:
+        results = list(ex.map(_run_one, paths))
     ok = True
-    for p in sorted(TESTS_DIR.glob("test_*.py")):
-        name = p.stem
-        try:
-            spec = importlib_util.spec_from_file_location(name, p)
-            mod = importlib_util.module_from_spec(spec)  # type: ignore
-            assert spec is not None and spec.loader is not None
-            spec.loader.exec_module(mod)  # type: ignore
-            result = True
-            if hasattr(mod, "run") and callable(mod.run):
-                result = bool(mod.run())
-            if not silent:
+    for name, result, err in results:
+        if not silent:
+            if err is not None:
+                print(f"[test] {name}: EXC {err}")
+            else:
                 print(f"[test] {name}: {'OK' if result else 'FAIL'}")
-            ok = ok and result
-        except Exception as e:
-            ok = False
-            if not silent:
-                print(f"[test] {name}: EXC {e}")
+        ok = ok and result
     return ok
 
+def _copy_db(src, dst):
+    """Consistent standalone copy of a SQLite database (WAL contents included)."""
+    if os.path.samefile(src, DB):
+        forge_flush()
+        source = _db()
+    else:
+        source = sqlite3.connect(f"file:{Path(src).as_posix()}?mode=ro", uri=True)
+    copy = sqlite3.connect(dst)
+    try:
+        with _DB_LOCK:
+            source.backup(copy)
+    finally:
+        copy.close()
+        if source is not _CONN:
+            source.close()
+
+def _link_tree(src, dst):
+    """
+    Mirror src into dst using hard links instead of byte copies.
+    Snapshot/.forge dirs are created empty (at any level) and __pycache__
+    is skipped; files fall back to shutil.copy2 where linking fails.
+    SQLite databases are never linked: a shared inode would let the
+    shadow replay its own WAL into the live DB. They are copied through
+    the backup API instead, and -wal/-shm/-journal files are left out.
+    """
+    os.mkdir(dst)
+    with os.scandir(src) as it:
+        for entry in it:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                if entry.name == "__pycache__":
+                    continue
+                if entry.name in {SNAP_DIR.name, FORGE_TMP.name}:
+                    os.mkdir(target)  # keep the dir, ignore everything inside
+                    continue
+                _link_tree(entry.path, target)
+            elif entry.name.endswith(_SQLITE_SIDE_FILES):
+                continue
+            elif entry.name.endswith(".sqlite"):
+                _copy_db(entry.path, target)
+            else:
+                try:
+                    os.link(entry.path, target)
+                except OSError:
+                    shutil.copy2(entry.path, target)
+
 def run_repair(strategy: str = "lint") -> int:
     if FREEZE_FLAG.exists():
         print("ERROR: Forge is frozen. Unfreeze to run repair.")
@@ -245,7 +691,9 @@ def run_repair(strategy: str = "lint") -> int:
     spec = load_yaml_like(CMD_DIR / "core.repair.yaml")
     change_budget_pct = int(spec.get("guards.change_budget_pct", 5))
     require_green = _boolish(spec.get("guards.require_green_tests", True))
-    policy_file = spec.get("guards.policy", "repair.policy.yaml")
+    policy_file = spec.get("guards.policy") or "repair.policy.yaml"
+    pol_path = POL_DIR / policy_file
+    pol = load_yaml_like(pol_path)
 
     print(f"[plan] strategy={strategy} scope=core-only budget={change_budget_pct}% require_green={require_green}")
 
@@ -264,29 +712,32 @@ def run_repair(strategy: str = "lint") -> int:
         new = original + f"\n# auto-repair touch: {datetime.now(timezone.utc).isoformat()}\n"
 
     # Policy checks
-    blocked_patterns = _load_repair_policy_patterns()
-    valid_pats = []
-    for pat in blocked_patterns:
-        try:
-            re.compile(pat)
-            valid_pats.append(pat)
-        except re.error:
-            print(f"[warden] WARN: skipping invalid regex from policy: {pat!r}")
-
-    hits = [pat for pat in valid_pats if re.search(pat, new)]
+    blocked_patterns = _load_repair_policy_patterns(pol_path, pol)
+    valid_pats, invalid_pats, fused = _policy_matchers(tuple(blocked_patterns))
+    for pat in invalid_pats:
+        print(f"[warden] WARN: skipping invalid regex from policy: {pat!r}")
+
+    # One pass over the candidate with the fused group-free patterns; only
+    # a hit there needs them scanned one by one to report which matched.
+    # Patterns with groups are not in the fused regex and always run alone.
+    if fused is not None and not fused.search(new):
+        hits = [pat for pat, rx in valid_pats if rx.groups and rx.search(new)]
+    else:
+        hits = [pat for pat, rx in valid_pats if rx.search(new)]
 
     if hits:
         print(f"[warden] BLOCK: patterns={hits}")
-        log("warden", "block", json.dumps({"patterns": hits}))
+        log("warden", "block", {"patterns": hits})
         return 2
 
     # Diff budget (rough %)
-    added_lines = [ln for ln in new.splitlines() if ln.strip() and ln not in original]
-    base_lines = max(1, len(original.splitlines()))
-    pct = int(min(100, (len(added_lines) / base_lines) * 100))
+    orig_lines = original.splitlines()
+    orig_set = set(orig_lines)
+    added_lines = sum(1 for ln in new.splitlines() if ln.strip() and ln not in orig_set)
+    base_lines = max(1, len(orig_lines))
+    pct = int(min(100, (added_lines / base_lines) * 100))
 
     # Escalation gate (policy-driven)
-    pol = load_yaml_like(POL_DIR / "repair.policy.yaml")
     req_path = (pol.get("escalation.require") or "human-ack.txt")
     triggers_raw = pol.get("escalation.trigger_strategies") or ""
     triggers = [t.strip() for t in triggers_raw.split(",") if t.strip()]
@@ -299,13 +750,13 @@ def run_repair(strategy: str = "lint") -> int:
             print(f"[warden] ESCALATION REQUIRED: create {ack_file.name} to proceed "
                       f"(triggered by strategy={strategy} or change size {pct}% > {max_no_ack}%).")
             log("warden", "escalation_required",
-            json.dumps({"strategy": strategy, "pct": pct, "max_no_ack": max_no_ack, "require": req_path}))
+            {"strategy": strategy, "pct": pct, "max_no_ack": max_no_ack, "require": req_path})
         return 5
 
     # If no escalation needed but still over hard budget, reject
     if pct > change_budget_pct and not need_ack:
         print(f"[warden] REJECT: change size {pct}% exceeds budget {change_budget_pct}%")
-        log("warden", "reject_change_budget", json.dumps({"pct": pct, "budget": change_budget_pct}))
+        log("warden", "reject_change_budget", {"pct": pct, "budget": change_budget_pct})
         return 3
 
 
@@ -314,16 +765,12 @@ def run_repair(strategy: str = "lint") -> int:
     if shadow.exists():
         shutil.rmtree(shadow)
 
-    def _ignore(dirpath, names):
-        base = Path(dirpath).name
-        blocked_dirs = {SNAP_DIR.name, "__pycache__", FORGE_TMP.name}
-        if base in blocked_dirs:
-            return names  # ignore everything inside
-        # also ignore pycache entries on any level
-        return [n for n in names if n == "__pycache__"]
-
-    shutil.copytree(ROOT, shadow, ignore=_ignore)
-    (shadow / "core" / "registry.py").write_text(new, encoding="utf-8")
+    _link_tree(ROOT, shadow)
+    # Break the hard link before writing so the original is left untouched
+    staged = shadow / "core" / "registry.py"
+    if staged.exists():
+        staged.unlink()
+    staged.write_text(new, encoding="utf-8")
     print(f"[stage] changes staged to {shadow}")
 
     # Tests
@@ -335,9 +782,9 @@ def run_repair(strategy: str = "lint") -> int:
     print("[tests] OK")
 
     # Snapshot current state, then apply
-    create_snapshot(label="auto-repair")
+    create_snapshot(label="auto-repair", dedup=True)
     target_file.write_text(new, encoding="utf-8")
-    log("rewriter", "apply", json.dumps({"file": str(target_file), "added_lines": len(added_lines)}))
+    log("rewriter", "apply", {"file": str(target_file), "added_lines": added_lines})
     print("[apply] repair applied to core/registry.py")
     return 0
 
@@ -392,13 +839,17 @@ if __name__ == "__main__":
 
 
 TEST_CODE = """def run():
-    import pathlib, subprocess, sys, json
+    import importlib.util, pathlib
     root = pathlib.Path(__file__).resolve().parents[1]
     agent = root / "agents" / "{name}" / "agent.py"
     if not agent.exists():
         return False
-    out = subprocess.check_output([sys.executable, str(agent), "smoke test"]).decode("utf-8", "ignore")
-    return '"result"' in out and '"steps"' in out
+    # import in-process instead of paying an interpreter start per test
+    spec = importlib.util.spec_from_file_location("agent_{name}", agent)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    out = mod.Agent().run("smoke test")
+    return "result" in out and "steps" in out
 """
 
 def scaffold_agent(name: str, kind: str = "generic") -> str:
@@ -425,7 +876,7 @@ def interpret_and_create(prompt: str) -> dict:
     else:
         kind = "generic"
 
-    tokens = re.findall(r"[A-Za-z0-9]+", prompt.title())
+    tokens = _TOKEN_RE.findall(prompt.title())
     name = (tokens[0] if tokens else "Agent")[:20]
 
     path = scaffold_agent(name, kind)
@@ -448,6 +899,10 @@ def main():
 
     p_snap = sub.add_parser("snapshot")
     p_snap.add_argument("--label", default="manual")
+    p_snap.add_argument("--compression", default="stored", choices=sorted(SNAP_COMPRESSION),
+                        help="stored (fast, default) or a compressed codec for archival")
+    p_snap.add_argument("--dedup", action="store_true",
+                        help="store file contents in snapshots/objects and zip only a manifest")
 
     p_repair = sub.add_parser("repair")
     p_repair.add_argument("--strategy", default="lint", choices=["lint", "refactor", "regen"])
@@ -462,6 +917,7 @@ def main():
     p_create.add_argument("prompt", help="Describe the agent you want to create")
 
     sub.add_parser("test")
+    sub.add_parser("compile-policies")
 
     args = ap.parse_args()
 
@@ -474,23 +930,32 @@ def main():
     elif args.cmd == "list-commands":
         list_commands()
     elif args.cmd == "snapshot":
-        create_snapshot(label=args.label)
+        create_snapshot(label=args.label, compression=SNAP_COMPRESSION[args.compression],
+                        dedup=args.dedup)
     elif args.cmd == "repair":
         sys.exit(run_repair(strategy=args.strategy))
     elif args.cmd == "make-agent":
         path = scaffold_agent(args.name, args.kind)
-        log("forge", "make_agent", json.dumps({"name": args.name, "kind": args.kind, "path": path}))
+        log("forge", "make_agent", {"name": args.name, "kind": args.kind, "path": path})
         print(f"Agent created: {path}")
     elif args.cmd == "create":
         info = interpret_and_create(args.prompt)
-        log("forge", "create_agent", json.dumps(info))
+        log("forge", "create_agent", info)
         print(f"Created {info['kind']} agent '{info['name']}' at {info['path']}")
     elif args.cmd == "test":
         ok = run_tests()
         print("ALL TESTS", "PASS" if ok else "FAIL")
         sys.exit(0 if ok else 1)
+    elif args.cmd == "compile-policies":
+        info = compile_policies()
+        log("forge", "compile_policies", info)
+        for pat in info["invalid"]:
+            print(f"[warden] WARN: invalid regex in policy: {pat!r}")
+        print(f"Policy {info['policy']} compiled: {info['patterns']} pattern(s)")
     else:
         ap.print_help()
+    # sys.exit() paths above are flushed by the atexit hook
+    forge_flush()
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,8 @@ import argparse, json, sys
 from pathlib import Path
 import importlib.util
 
+from agents._common import HISTORY_LIMIT, Memory
+
 ROOT = Path(__file__).resolve().parent
 AGENTS_DIR = ROOT / "agents"
 
@@ -59,16 +61,9 @@ def info(agent_name: str):
     }, indent=2))
 
 def history(agent_name: str, limit: int = 10):
-    path = AGENTS_DIR / agent_name / "memory.json"
-    if not path.exists():
-        print("[]")
-        return
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        data = {}
-    hist = (data.get("history") or [])[-limit:]
-    print(json.dumps(hist, indent=2))
+    # memory.json plus the runs logged since the agent last compacted it
+    mem = Memory(AGENTS_DIR / agent_name, limit=max(limit, HISTORY_LIMIT))
+    print(json.dumps(mem.history[-limit:], indent=2))
 
 def main():
     ap = argparse.ArgumentParser(prog="ghostai", description="GhostAI runtime")
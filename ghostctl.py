@@ -3,6 +3,8 @@ import argparse, subprocess, sys
 from pathlib import Path
 import zipfile
 
+from core.snapshot import scan_tree, zip_add
+
 ROOT = Path(__file__).resolve().parent
 FORGE = ROOT / "forge.py"
 AGENTS = ROOT / "agents"
@@ -12,18 +14,24 @@ def spawn(name: str, kind: str):
     cmd = [sys.executable, str(FORGE), "make-agent", "--name", name, "--kind", kind]
     subprocess.check_call(cmd)
 
-def pack(name: str, version: str = "0.1"):
+def pack(name: str, version: str = "0.1", fast: bool = False):
     agent_dir = AGENTS / name
     if not agent_dir.exists():
         sys.exit(f"Agent not found: {agent_dir}")
     DIST.mkdir(exist_ok=True)
     out = DIST / f"{name}_v{version}.zip"
-    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as z:
-        for p in agent_dir.rglob("*"):
-            if "__pycache__" in p.parts:
-                continue
-            # store paths relative to project root so unzip recreates agents/<Name>/...
-            z.write(p, p.relative_to(ROOT))
+    # Level 1 deflate: small sources compress nearly as well, much faster.
+    compression, level = (zipfile.ZIP_STORED, None) if fast else (zipfile.ZIP_DEFLATED, 1)
+    with zipfile.ZipFile(out, "w", compression, compresslevel=level) as z:
+        # store paths relative to project root so unzip recreates agents/<Name>/...
+        for entry, rel in scan_tree(agent_dir, {"__pycache__"}, f"agents/{name}/"):
+            zip_add(z, entry.path, rel, entry.stat())
+        # shared helpers imported by agent.py, and the package marker that
+        # keeps another installed `agents` package from shadowing them
+        for fname in ("__init__.py", "_common.py"):
+            shared = AGENTS / fname
+            if shared.exists():
+                zip_add(z, shared, f"agents/{fname}")
     print(out)
 
 def main():
@@ -37,12 +45,13 @@ def main():
     p_pack = sub.add_parser("pack")
     p_pack.add_argument("name")
     p_pack.add_argument("--version", default="0.1")
+    p_pack.add_argument("--fast", action="store_true", help="store files uncompressed")
 
     args = ap.parse_args()
     if args.cmd == "spawn":
         spawn(args.name, args.kind)
     elif args.cmd == "pack":
-        pack(args.name, args.version)
+        pack(args.name, args.version, args.fast)
     else:
         ap.print_help()
 
@@ -1,27 +1,37 @@
 
 #!/usr/bin/env python3
 from pathlib import Path
-import argparse, zipfile, sys
+import argparse, os, zipfile, sys
+from concurrent.futures import ProcessPoolExecutor
+
+from core.snapshot import scan_tree, zip_add
 
 ROOT = Path(__file__).resolve().parent
 AGENTS = ROOT / "agents"
 DIST = ROOT / "dist"
 
-def pack_agent(agent_dir: Path, version: str):
+def pack_agent(agent_dir: Path, version: str, fast: bool = False):
     out = DIST / f"{agent_dir.name}_v{version}.zip"
     DIST.mkdir(exist_ok=True)
-    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as z:
-        for p in agent_dir.rglob("*"):
-            if "__pycache__" in p.parts:
-                continue
-            if p.name == "memory.json":
+    # Level 1 deflate: small sources compress nearly as well, much faster.
+    compression, level = (zipfile.ZIP_STORED, None) if fast else (zipfile.ZIP_DEFLATED, 1)
+    with zipfile.ZipFile(out, "w", compression, compresslevel=level) as z:
+        for entry, rel in scan_tree(agent_dir, {"__pycache__"}, f"agents/{agent_dir.name}/"):
+            if entry.name in {"memory.json", "memory.jsonl"}:
                 continue
-            z.write(p, p.relative_to(ROOT))
+            zip_add(z, entry.path, rel, entry.stat())
+        # shared helpers imported by agent.py, and the package marker that
+        # keeps another installed `agents` package from shadowing them
+        for fname in ("__init__.py", "_common.py"):
+            shared = AGENTS / fname
+            if shared.exists():
+                zip_add(z, shared, f"agents/{fname}")
     return out
 
 def main():
     ap = argparse.ArgumentParser(description="Pack all agents into zips")
     ap.add_argument("--version", default="0.1", help="version label for zip names")
+    ap.add_argument("--fast", action="store_true", help="store files uncompressed")
     args = ap.parse_args()
 
     if not AGENTS.exists():
@@ -30,11 +40,11 @@ def main():
     if not agents:
         sys.exit("No agents to pack (no agent.py found).")
 
-    outs = []
-    for d in agents:
-        out = pack_agent(d, args.version)
+    # Each agent zips to its own file, so the packs can run side by side.
+    with ProcessPoolExecutor(max_workers=min(len(agents), os.cpu_count() or 1)) as ex:
+        outs = list(ex.map(pack_agent, agents, [args.version] * len(agents), [args.fast] * len(agents)))
+    for out in outs:
         print(out)
-        outs.append(out)
 
     print(f"\nPacked {len(outs)} agent(s) to {DIST}")
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
 def run():
-    import pathlib, subprocess, sys, json
+    import importlib.util, pathlib
     root = pathlib.Path(__file__).resolve().parents[1]
     agent = root / "agents" / "Cyberpunk" / "agent.py"
     if not agent.exists():
         return False
-    out = subprocess.check_output([sys.executable, str(agent), "smoke test"]).decode("utf-8", "ignore")
-    return '"result"' in out and '"steps"' in out
+    # import in-process instead of paying an interpreter start per test
+    spec = importlib.util.spec_from_file_location("agent_Cyberpunk", agent)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    out = mod.Agent().run("smoke test")
+    return "result" in out and "steps" in out
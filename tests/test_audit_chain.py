@@ -0,0 +1,39 @@
+def _chain_ok(forge, rows):
+    # recompute every row_hash from its predecessor, as an auditor would
+    prev = b""
+    for ts, actor, action, detail, prev_hash, row_hash in rows:
+        if (prev_hash or b"") != prev or forge._row_hash(prev, ts, actor, action, detail) != row_hash:
+            return False
+        prev = row_hash
+    return True
+
+
+def run():
+    import importlib.util
+    import pathlib
+    import tempfile
+    root = pathlib.Path(__file__).resolve().parents[1]
+    spec = importlib.util.spec_from_file_location("forge_under_test", root / "forge.py")
+    forge = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(forge)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        forge.STATE = pathlib.Path(tmp)
+        forge.DB = forge.STATE / "index.sqlite"
+        try:
+            forge.ensure_state()
+            forge.log("test", "first")
+            forge.log("test", "detail", {"k": [1, 2], "s": "é"})
+            forge.forge_flush()
+            forge.log("test", "after-flush", "chained to the committed head")
+            forge.forge_flush()
+            sql = "SELECT ts, actor, action, detail, prev_hash, row_hash FROM audit_log ORDER BY id"
+            conn = forge._db()
+            rows = conn.execute(sql).fetchall()
+            ok = len(rows) >= 3 and _chain_ok(forge, rows)
+            # an edited row must break the chain
+            conn.execute("UPDATE audit_log SET detail = 'edited' WHERE action = 'detail'")
+            ok = ok and not _chain_ok(forge, conn.execute(sql).fetchall())
+        finally:
+            forge._close_db()
+    return ok
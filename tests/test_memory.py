@@ -0,0 +1,26 @@
+def run():
+    # A log left behind by an interrupted compaction (its log_gen is behind
+    # memory.json's) was already folded in and must not be replayed.
+    import json
+    import pathlib
+    import sys
+    import tempfile
+    root = pathlib.Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(root))
+    from agents._common import Memory
+
+    with tempfile.TemporaryDirectory() as tmp:
+        d = pathlib.Path(tmp)
+        m = Memory(d, limit=3)
+        for run_id in ("a", "b", "c"):
+            m.remember({"run": run_id})  # the third one compacts to log_gen 1
+        stale = [{"log_gen": 0}, {"run": "a"}, {"run": "b"}]
+        (d / "memory.jsonl").write_text("".join(json.dumps(o) + "\n" for o in stale), encoding="utf-8")
+
+        m = Memory(d, limit=3)
+        ok = [e["run"] for e in m.history] == ["a", "b", "c"]
+        m.remember({"run": "d"})  # drops the stale log, starts a gen-1 one
+        first = (d / "memory.jsonl").read_text(encoding="utf-8").splitlines()[0]
+        ok = ok and json.loads(first) == {"log_gen": 1}
+        ok = ok and [e["run"] for e in Memory(d, limit=3).history] == ["b", "c", "d"]
+    return ok
@@ -0,0 +1,37 @@
+def run():
+    # Blocked patterns must not depend on whether PyYAML parsed the policy:
+    # values YAML would retype are read back as the literal policy text.
+    import importlib.util
+    import pathlib
+    import tempfile
+    root = pathlib.Path(__file__).resolve().parents[1]
+    spec = importlib.util.spec_from_file_location("forge_under_test", root / "forge.py")
+    forge = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(forge)
+
+    text = (
+        "rules:\n"
+        "  - id: a\n"
+        "    pattern: on\n"
+        "  - id: b\n"
+        "    pattern: 0x10\n"
+        "  - id: c\n"
+        "    pattern: [abc]\n"
+        "  - id: d\n"
+        "    pattern: foo #bar\n"
+        "  - id: e\n"
+        "    pattern: 'eval\\(' # quoted\n"
+    )
+    literal = ["on", "0x10", "[abc]", "foo", "eval\\("]
+    rails = list(forge.SAFETY_RAILS)
+    with tempfile.TemporaryDirectory() as tmp:
+        pol = pathlib.Path(tmp) / "p.policy.yaml"
+        pol.write_text(text, encoding="utf-8")
+        # what PyYAML hands back for the same file
+        parsed = {"rules": [{"id": "a", "pattern": True}, {"id": "b", "pattern": 16},
+                            {"id": "c", "pattern": ["abc"]}, {"id": "d", "pattern": "foo"},
+                            {"id": "e", "pattern": "eval\\("}]}
+        retyped = forge._load_repair_policy_patterns(pol, parsed)
+        scanned = forge._load_repair_policy_patterns(pol, None)
+        strings = forge._load_repair_policy_patterns(pol, {"rules": [{"pattern": "x"}]})
+    return retyped == scanned == literal + rails and strings == ["x"] + rails
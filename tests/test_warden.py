@@ -0,0 +1,51 @@
+# Rule sets that can't go straight into a fused alternation: a
+# back-reference group, an inline flag (only legal at a pattern's start)
+# and overlapping rules. Fused scans must agree with one regex per rule.
+GROUP = r"(\w)\1\1"
+INLINE = r"(?i)secret"
+OVERLAP = [r"rm -rf", r"rm\b", r"-rf /"]
+# GROUP after another group: fused, its \1 would point at "(rm)"
+AFTER_GROUP = [r"(rm) -rf"] + OVERLAP + [GROUP]
+TEXTS = ["clean text", "zzz", "rm -rf /", "rm it", "a SECRET", "ok -rf /tmp", "bbb rm -rf /", ""]
+
+
+def _expected(patterns, text):
+    import re
+    return [p for p in patterns if re.search(p, text)]
+
+
+def _forge(root):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("forge_under_test", root / "forge.py")
+    forge = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(forge)
+    return forge
+
+
+def _matcher_hits(matchers, text):
+    # the scan run_repair does with _policy_matchers' result
+    valid, _, fused = matchers
+    if fused is not None and not fused.search(text):
+        return [pat for pat, rx in valid if rx.groups and rx.search(text)]
+    return [pat for pat, rx in valid if rx.search(text)]
+
+
+def run():
+    import pathlib
+    import sys
+    root = pathlib.Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(root))
+    from core.warden import Rule, Warden
+
+    ok = True
+    for patterns in (OVERLAP, AFTER_GROUP, [GROUP, INLINE] + OVERLAP, [GROUP]):
+        w = Warden([Rule(id=p, pattern=p) for p in patterns])
+        ok = ok and all(w.scan_text(t) == _expected(patterns, t) for t in TEXTS)
+
+    forge = _forge(root)
+    for patterns in (OVERLAP, AFTER_GROUP, [GROUP, INLINE] + OVERLAP, [GROUP]):
+        matchers = forge._policy_matchers(tuple(patterns))
+        ok = ok and all(_matcher_hits(matchers, t) == _expected(patterns, t) for t in TEXTS)
+    # an inline flag mid-alternation can't be fused; it is still valid alone
+    valid, invalid, fused = forge._policy_matchers((GROUP, INLINE) + tuple(OVERLAP))
+    return ok and fused is None and not invalid and len(valid) == 5